@@ -32,11 +32,26 @@ selections.
 
 from __future__ import with_statement, print_function, division
 
+import functools
 from collections import OrderedDict
 
-import numpy
+#: translation tables for the boolean tokens in compound selections
+_TRANSLATIONS = {
+    'charmm': str.maketrans({'|': ' .or. ', '&': ' .and. ', '!': ' .not. '}),
+    'vmd': str.maketrans({'|': ' or ', '&': ' and ', '!': ' not '}),
+    'pymol': str.maketrans({'|': ' or ', '&': ' and ', '!': ' not '}),
+}
 
 
+@functools.lru_cache(maxsize=None)
+def _translate(mode, s):
+    """Replace tokens |&! in *s* --> or,and,not for *mode*"""
+    try:
+        table = _TRANSLATIONS[mode]
+    except KeyError:
+        raise ValueError('mode = %s not known' % mode)
+    return s.translate(table)
+
 
 class DomDef(object):
     """Class to handle input/ouput.
@@ -46,21 +61,21 @@ class DomDef(object):
           make it more table-driven.
     """
     # ugly & growing... :
-    vmdmacro = "atomselect macro %(domname)s {resid %(start_resid)d to %(end_resid)d}"
-    vmdcompound = "atomselect macro %(domname)s {%(definition)s}"
-    charmmselection = "define %(domname)-8s select resid %(start_resid)3d : %(end_resid)3d  end"
-    charmmcompound = "define %(domname)-8s select %(definition)s  end"
-    pymolselection = "select %(domname)s, polymer and resi %(start_resid)d-%(end_resid)d"
-    pymolcompound = "select %(domname)s, %(definition)s"
+    vmdmacro = "atomselect macro {domname} {{resid {start_resid:d} to {end_resid:d}}}"
+    vmdcompound = "atomselect macro {domname} {{{definition}}}"
+    charmmselection = "define {domname:<8s} select resid {start_resid:3d} : {end_resid:3d}  end"
+    charmmcompound = "define {domname:<8s} select {definition}  end"
+    pymolselection = "select {domname}, polymer and resi {start_resid:d}-{end_resid:d}"
+    pymolcompound = "select {domname}, {definition}"
     def __init__(self,filename,offset=0):
         self.filename = filename
         self.domains = OrderedDict()
         self.compounds = OrderedDict()
-        self.domain_order = []
         self.offset = int(offset)
         self.load(filename)
 
     def load(self,filename):
+        offset = self.offset
         with open(filename,'r') as domdef:
             for line in domdef:
                 line = line.strip()
@@ -74,53 +89,68 @@ class DomDef(object):
                 else:
                     # simple selection (macro) definition
                     domname,start_resid,end_resid = fields
-                    self.domains[str(domname)] = [self.transform(int(n)) for n in (start_resid, end_resid)]
-                    self.domain_order.append(domname)
+                    # inlined transform()
+                    self.domains[str(domname)] = (max(1, int(start_resid) + offset),
+                                                  max(1, int(end_resid) + offset))
         # find first and last residue from macros
-        resids = numpy.sort(numpy.ravel(self.domains.values()))
-        self.first = resids[0]
-        self.last = resids[-1]
+        resids = [resid for pair in self.domains.values() for resid in pair]
+        self.first = min(resids)
+        self.last = max(resids)
 
     def transform(self, resid):
         """Return the resid with offset applied; minimum value is 1."""
-        x = resid + self.offset
-        if x < 1:
-            x = 1
-        return x
+        return max(1, resid + self.offset)
+
+    def _header(self, comment):
+        return ("%(comment)s $Id" "$\n"
+                """%(comment)s domain defs from "%(filename)s"\n"""
+                """%(comment)s offset = %(offset)d""" %
+                {'comment': comment, 'filename': self.filename, 'offset': self.offset})
+
+    @functools.cached_property
+    def _header_hash(self):
+        """Header for output files with '#' comments."""
+        return self._header('#')
+
+    @functools.cached_property
+    def _header_bang(self):
+        """Header for output files with '!' comments."""
+        return self._header('!')
 
     def write(self,filename):
         """Write as domdef input file."""
-        with open(filename,'w') as domdef:
-            domdef.write("""# $Id: domdef.py 1155 2010-05-17 17:15:26Z oliver $
+        lines = ["""# $Id: domdef.py 1155 2010-05-17 17:15:26Z oliver $
 # This file is in a format suitable for scripts/domdef.py
 # input = %(filename)r
 # offset = %(offset)d
 
-# name      start    end
-"""
-                         % vars(self))
-            for domname,(start_resid,end_resid) in self._ordered_domains():
-                domdef.write("%(domname)-11s %(start_resid)5d  %(end_resid)5d\n"% vars())
+# name      start    end""" % {'filename': self.filename, 'offset': self.offset}]
+        for domname,(start_resid,end_resid) in self._ordered_domains():
+            lines.append(f"{domname:<11s} {start_resid:5d}  {end_resid:5d}")
+
+        # write compounds
+        lines.append("# compound statements")
+        for domname, definition in self.compounds.items():
+            lines.append(f"@{domname:<11s}  {definition}")
 
-            # write compounds
-            domdef.write("# compound statements\n")
-            for domname, definition in self.compounds.items():
-                domdef.write("@%(domname)-11s  %(definition)s\n" % vars())
+        with open(filename,'w') as domdef:
+            domdef.write("\n".join(lines) + "\n")
 
     def write_vmd(self,filename):
-        with open(filename,'w') as tcl:
-            tcl.write("# $Id" "$\n"
-                      """# domain defs from "%(filename)s"\n"""
-                      """# offset = %(offset)d\n""" % vars(self))
-            for domname,(start_resid,end_resid) in self._ordered_domains():
-                tcl.write(self.vmdmacro % vars() + '\n')
-
-            # write compounds
-            tcl.write("# compound statements\n")
-            for domname, definition in self.compounds.items():
-                definition = self._transform('vmd',definition)
-                tcl.write(self.vmdcompound % vars() + '\n')
+        lines = [self._header_hash]
+        for domname,(start_resid,end_resid) in self._ordered_domains():
+            lines.append(self.vmdmacro.format_map(
+                {'domname': domname, 'start_resid': start_resid, 'end_resid': end_resid}))
+
+        # write compounds
+        lines.append("# compound statements")
+        for domname, definition in self.compounds.items():
+            definition = self._transform('vmd',definition)
+            lines.append(self.vmdcompound.format_map(
+                {'domname': domname, 'definition': definition}))
 
+        with open(filename,'w') as tcl:
+            tcl.write("\n".join(lines) + "\n")
             self._write_vmd_addrep_domains(tcl)
 
         print("# Load macros with 'source %s' in VMD" % filename)
@@ -135,7 +165,7 @@ class DomDef(object):
                    "  mol color ColorID $color\n"+
                    "  mol material $material\n"+
                    "  mol rep $representation\n") % kwargs)
-        tcl.write("  set selections \"%s\"\n" % " ".join(self.domain_order))
+        tcl.write("  set selections \"%s\"\n" % " ".join(self.domains))
         tcl.write("  foreach sel $selections {\n"
                   "    mol selection $sel\n"
                   "    mol addrep top\n"
@@ -152,80 +182,77 @@ class DomDef(object):
         print("# Wrote domains to Bendix helix file %r" % filename)
 
     def write_pymol(self,filename):
+        lines = [self._header_hash]
+        for domname,(start_resid,end_resid) in self._ordered_domains():
+            lines.append(self.pymolselection.format_map(
+                {'domname': domname, 'start_resid': start_resid, 'end_resid': end_resid}))
+
+        # write compounds
+        lines.append("# compound statements")
+        for domname, definition in self.compounds.items():
+            definition = self._transform('pymol',definition)
+            lines.append(self.pymolcompound.format_map(
+                {'domname': domname, 'definition': definition}))
+
         with open(filename,'w') as pml:
-            pml.write("# $Id" "$\n"
-                     """# domain defs from "%(filename)s"\n"""
-                     """# offset = %(offset)d\n""" % vars(self))
-            for domname,(start_resid,end_resid) in self._ordered_domains():
-                pml.write(self.pymolselection % vars() + '\n')
-
-            # write compounds
-            pml.write("# compound statements\n")
-            for domname, definition in self.compounds.items():
-                definition = self._transform('pymol',definition)
-                pml.write(self.pymolcompound % vars() + '\n')
+            pml.write("\n".join(lines) + "\n")
 
         print("# Load selection with '@%s' in PyMOL" % filename)
 
     def write_charmm(self,filename):
+        lines = [self._header_bang]
+        for domname,(start_resid,end_resid) in self._ordered_domains():
+            lines.append(self.charmmselection.format_map(
+                {'domname': domname, 'start_resid': start_resid, 'end_resid': end_resid}))
+
+        # write compounds
+        lines.append("! compound statements")
+        for domname, definition in self.compounds.items():
+            definition = self._transform('charmm',definition)
+            lines.append(self.charmmcompound.format_map(
+                {'domname': domname, 'definition': definition}))
+
         with open(filename,'w') as charmm:
-            charmm.write("! $Id" "$\n"
-                """! domain defs from "%(filename)s"\n"""
-                """! offset = %(offset)d\n""" % vars(self))
-            for domname,(start_resid,end_resid) in self._ordered_domains():
-                charmm.write(self.charmmselection % vars() + '\n')
-
-            # write compounds
-            charmm.write("! compound statements\n")
-            for domname, definition in self.compounds.items():
-                definition = self._transform('charmm',definition)
-                charmm.write(self.charmmcompound % vars() + '\n')
+            charmm.write("\n".join(lines) + "\n")
 
         print("""# Add SELECTION definitons to Charmm script with 'stream "%s"'""" % filename)
 
     def write_xvg(self,filename):
         """Write secondary structure XVG graph."""
 
-        with open(filename,'w') as domdef:
-            domdef.write("""# $Id: domdef.py 1155 2010-05-17 17:15:26Z oliver $
+        # both graphs (y = +0.5 and y = -0.5) are built in a single pass
+        first = f"{self.first:5d}  0"
+        pos_lines = [first]
+        neg_lines = [first]
+        last_start_resid = self.first
+        for domname,(start_resid,end_resid) in self._ordered_domains():
+            if start_resid < last_start_resid:
+                break  # only look at first set of definitions
+            start, end = f"{start_resid:5d}", f"{end_resid:5d}"
+            pos_lines.extend((f"{start}  0", f"{start}  0.5", f"{end}  0.5", f"{end}  0"))
+            neg_lines.extend((f"{start}  0", f"{start}  -0.5", f"{end}  -0.5", f"{end}  0"))
+            last_start_resid = start_resid
+        last = f"{self.last:5d}  0"
+        pos_lines.append(last)
+        neg_lines.append(last)
+
+        lines = ["""# $Id: domdef.py 1155 2010-05-17 17:15:26Z oliver $
 # input = %(filename)r
-# offset = %(offset)d
-"""
-                         % vars(self))
-            def _write(yval):
-                zero = 0
-                start_resid = last_start_resid = self.first
-                domdef.write("%(start_resid)5d  %(zero)g\n"% vars())
-                for domname,(start_resid,end_resid) in self._ordered_domains():
-                    if start_resid < last_start_resid:
-                        break  # only look at first set of definitions
-                    domdef.write("%(start_resid)5d  %(zero)g\n"% vars())
-                    domdef.write("%(start_resid)5d  %(yval)g\n"% vars())
-                    domdef.write("%(end_resid)5d  %(yval)g\n"% vars())
-                    domdef.write("%(end_resid)5d  %(zero)g\n"% vars())
-                    last_start_resid = start_resid
-                domdef.write("%5d  %g\n" % (self.last, zero))
-
-            _write(0.5)
-            domdef.write('&\n')
-            _write(-0.5)
+# offset = %(offset)d""" % {'filename': self.filename, 'offset': self.offset}]
+        lines.extend(pos_lines)
+        lines.append('&')
+        lines.extend(neg_lines)
+
+        with open(filename,'w') as domdef:
+            domdef.write("\n".join(lines) + "\n")
         print("# Wrote xvg file with secondary structure graph")
 
     def _ordered_domains(self):
-        for domname in self.domain_order:
-            yield domname, self.domains[domname]
+        return self.domains.items()
 
     def _transform(self, mode, s):
         """Replace tokens |&! --> or,and,not"""
-        # XXX: should be a dict of translation rules
-        if mode == "charmm":
-            return s.replace('|', ' .or. ').replace('&', ' .and. ').replace('!',' .not. ')
-        elif mode == "vmd":
-            return s.replace('|', ' or ').replace('&', ' and ').replace('!',' not ')
-        elif mode == "pymol":
-            return s.replace('|', ' or ').replace('&', ' and ').replace('!',' not ')
-        else:
-            raise ValueError('mode = %s not known' % mode)
+        return _translate(mode, s)
 
 if __name__ == '__main__':
     from optparse import OptionParser